@@ -2,33 +2,65 @@
 # ClimateScope Dashboard
 # ================================
 
+import json
+import os
 import dash
-from dash import dcc, html, dash_table
+from dash import dcc, html, dash_table, no_update
 from dash.dependencies import Input, Output
-import plotly.express as px
+from flask_caching import Cache
+import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 
 # ================================
 # 1. LOAD & CLEAN DATA
 # ================================
 
-df = pd.read_csv("GlobalWeatherRepository.csv")
+CSV_FILE = "GlobalWeatherRepository.csv"
+PARQUET_FILE = "weather.parquet"
+
+# The CSV is parsed once and cached as typed Parquet; restarts read the
+# Parquet copy unless the CSV has changed since it was written.
+if os.path.exists(PARQUET_FILE) and (
+    not os.path.exists(CSV_FILE)
+    or os.path.getmtime(PARQUET_FILE) >= os.path.getmtime(CSV_FILE)
+):
+    df = pd.read_parquet(PARQUET_FILE, engine='pyarrow')
+else:
+    df = pd.read_csv(CSV_FILE)
+    df.columns = df.columns.str.lower().str.strip()
+    df['last_updated'] = pd.to_datetime(df['last_updated'], errors='coerce')
+    df['country'] = df['country'].astype('category')
+
+    # Write beside the target and rename, so a concurrent reader never
+    # sees a partially written file.
+    tmp_file = f"{PARQUET_FILE}.{os.getpid()}.tmp"
+    df.to_parquet(tmp_file, engine='pyarrow', compression='zstd')
+    os.replace(tmp_file, PARQUET_FILE)
 
-df.columns = df.columns.str.lower().str.strip()
-df['last_updated'] = pd.to_datetime(df['last_updated'], errors='coerce')
 df = df.dropna(subset=['last_updated'])
+df = df.sort_values('last_updated').reset_index(drop=True)
+
+# Nanosecond timestamps, whatever resolution the loader produced, so the
+# int64 views used for date filtering share one unit.
+df['last_updated'] = df['last_updated'].astype('datetime64[ns]')
+
+COUNTRY_CATS = df['country'].cat.categories
+DATE_MIN = df['last_updated'].min()
+DATE_MAX = df['last_updated'].max()
 
 # ================================
 # 2. FEATURE ENGINEERING
 # ================================
 
-df['heat_index'] = df['temperature_celsius'] + 0.33 * df['humidity'] - 0.7
-df['wind_chill'] = (
-    13.12
-    + 0.6215 * df['temperature_celsius']
-    - 11.37 * (df['wind_kph'] ** 0.16)
-)
+t = df['temperature_celsius'].to_numpy()
+h = df['humidity'].to_numpy()
+w = df['wind_kph'].to_numpy()
+
+df['heat_index'] = t + 0.33 * h - 0.7
+df['wind_chill'] = 13.12 + 0.6215 * t - 11.37 * np.power(w, 0.16)
 
 METRICS = {
     'temperature_celsius': 'Temperature (°C)',
@@ -46,29 +78,141 @@ METRICS = {
 temp_thr = df['temperature_celsius'].quantile(0.99)
 wind_thr = df['wind_kph'].quantile(0.99)
 
+# Selected before the float32 downcast below, so the table shows the
+# original values.
 extreme_df = df[
     (df['temperature_celsius'] >= temp_thr) |
     (df['wind_kph'] >= wind_thr)
-]
+].reset_index(drop=True)
+
+EXTREME_PAGE_SIZE = 10
+EXTREME_COLUMNS = [{'name': c, 'id': c} for c in extreme_df.columns]
+
+EXTREME_COUNTS = (
+    extreme_df['country']
+    .value_counts()
+    .loc[lambda counts: counts > 0]
+    .sort_values(ascending=False)
+)
+EXTREME_HIST_FIG = go.Figure(go.Bar(x=EXTREME_COUNTS.index, y=EXTREME_COUNTS.values))
+EXTREME_HIST_FIG.update_layout(title='Extreme Event Frequency')
+
+# ================================
+# 4. PRE-AGGREGATION
+# ================================
+
+# Single precision is plenty for the charts and halves each metric's
+# memory; extreme_df above keeps the full-precision values for its table.
+df[list(METRICS)] = df[list(METRICS)].astype('float32')
+
+
+def build_monthly(src):
+    """Country x month mean of every metric, in date order.
+
+    Groups are keyed month-major on integer codes, so the bincount
+    output already comes out sorted by month.
+    """
+    month_code = src['last_updated'].values.astype('datetime64[M]').astype(np.int64)
+    country_code = src['country'].cat.codes.to_numpy().astype(np.int64)
+    month0 = month_code.min()
+    n_countries = len(src['country'].cat.categories)
+    n_groups = (month_code.max() - month0 + 1) * n_countries
+
+    has_country = country_code >= 0
+    gkey = ((month_code - month0) * n_countries + country_code)[has_country]
+    keys = np.flatnonzero(np.bincount(gkey, minlength=n_groups))
+
+    monthly = pd.DataFrame({
+        'country': pd.Categorical.from_codes(
+            keys % n_countries, categories=src['country'].cat.categories
+        ),
+        'last_updated': (keys // n_countries + month0).astype('datetime64[M]').astype('datetime64[ns]')
+    })
+    for col in METRICS:
+        vals = src[col].to_numpy(dtype=np.float64)[has_country]
+        ok = ~np.isnan(vals)
+        sums = np.bincount(gkey[ok], weights=vals[ok], minlength=n_groups)[keys]
+        counts = np.bincount(gkey[ok], minlength=n_groups)[keys]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            monthly[col] = (sums / counts).astype(np.float32)
+    return monthly
+
+
+# Country x month panel built once; callbacks only slice it.
+MONTHLY = build_monthly(df)
+
+PRECOMPUTED = {'Daily': df, 'Monthly': MONTHLY}
+
+# Sorted int64 nanosecond timestamps per frame, so date filters become a
+# binary search over plain integers.
+TIMESTAMPS = {
+    agg: src['last_updated'].values.view(np.int64)
+    for agg, src in PRECOMPUTED.items()
+}
+
+# Columns the figure builders read; the rest never reaches the callbacks
+TABLE_COLUMNS = ['country', 'last_updated'] + list(METRICS)
+
+# Arrow tables are the callbacks' only copy of the data: slicing is
+# zero-copy and the country filter runs in Arrow's C++ kernels, outside
+# the GIL.
+TABLES = {
+    agg: pa.Table.from_pandas(src[TABLE_COLUMNS], preserve_index=False)
+    for agg, src in PRECOMPUTED.items()
+}
+
+# From here on the app reads only TABLES, TIMESTAMPS and extreme_df, so
+# drop the pandas frames (and the feature arrays viewing them) rather
+# than hold the data twice in every worker.
+del df, MONTHLY, PRECOMPUTED, t, h, w
 
 # ================================
-# 4. DASH APP SETUP
+# 5. DASH APP SETUP
 # ================================
 
 app = dash.Dash(__name__)
 app.title = "ClimateScope Dashboard"
 
+# Figures are memoized per filter combination as serialized JSON, so a
+# cache hit skips both building and validating the Plotly figure. Both
+# backends are shared by every worker process serving the app; set
+# REDIS_URL to share the cache across hosts as well.
+if os.environ.get('REDIS_URL'):
+    cache_config = {
+        'CACHE_TYPE': 'RedisCache',
+        'CACHE_REDIS_URL': os.environ['REDIS_URL']
+    }
+else:
+    cache_config = {
+        'CACHE_TYPE': 'FileSystemCache',
+        'CACHE_DIR': '.cache'
+    }
+cache_config['CACHE_DEFAULT_TIMEOUT'] = 3600
+
+cache = Cache(app.server, config=cache_config)
+
+# Part of every memoize key, so a rebuilt Parquet file or an edited figure
+# builder never serves figures cached by an earlier run.
+CACHE_VERSION = f"{os.stat(PARQUET_FILE).st_mtime_ns}-{os.stat(__file__).st_mtime_ns}"
+
+
+def versioned(fname):
+    return f"{fname}-{CACHE_VERSION}"
+
 # ================================
-# 5. HORIZONTAL FILTER BAR
+# 6. HORIZONTAL FILTER BAR
 # ================================
 
+COUNTRY_OPTIONS = [{'label': c, 'value': c} for c in COUNTRY_CATS]
+METRIC_OPTIONS = [{'label': v, 'value': k} for k, v in METRICS.items()]
+
 filters = html.Div(
     children=[
         html.Div([
             html.Label("Country"),
             dcc.Dropdown(
                 id='country-filter',
-                options=[{'label': c, 'value': c} for c in sorted(df['country'].unique())],
+                options=COUNTRY_OPTIONS,
                 multi=True,
                 placeholder="All countries"
             )
@@ -78,8 +222,8 @@ filters = html.Div(
             html.Label("Date Range"),
             dcc.DatePickerRange(
                 id='date-range',
-                start_date=df['last_updated'].min(),
-                end_date=df['last_updated'].max()
+                start_date=DATE_MIN,
+                end_date=DATE_MAX
             )
         ], style={'width': '25%'}),
 
@@ -87,7 +231,7 @@ filters = html.Div(
             html.Label("Metric"),
             dcc.Dropdown(
                 id='metric-selector',
-                options=[{'label': v, 'value': k} for k, v in METRICS.items()],
+                options=METRIC_OPTIONS,
                 value='temperature_celsius'
             )
         ], style={'width': '25%'}),
@@ -116,9 +260,32 @@ filters = html.Div(
 )
 
 # ================================
-# 6. APP LAYOUT
+# 7. APP LAYOUT
 # ================================
 
+# Static tabs are built once and shown or hidden in the browser
+extreme_content = html.Div([
+    dash_table.DataTable(
+        id='extreme-table',
+        columns=EXTREME_COLUMNS,
+        page_action='custom',
+        page_current=0,
+        page_size=EXTREME_PAGE_SIZE,
+        page_count=-(-len(extreme_df) // EXTREME_PAGE_SIZE),
+        style_table={'overflowX': 'auto'}
+    ),
+    dcc.Graph(figure=EXTREME_HIST_FIG)
+])
+
+help_content = html.Div([
+    html.H4("Help & User Guide"),
+    html.P(
+        "Use the filters above to explore climate metrics. "
+        "Choose Daily or Monthly aggregation for trend analysis. "
+        "Hover, zoom, and download charts using Plotly tools."
+    )
+])
+
 app.layout = html.Div([
 
     html.H1(
@@ -141,153 +308,326 @@ app.layout = html.Div([
         dcc.Tab(label='Help', value='help'),
     ]),
 
-    html.Div(id='tab-content')
+    # Last selected tab that needs the server to render it
+    dcc.Store(id='server-tab', data='exec'),
+    # Current filter selection shared by the per-tab callbacks
+    dcc.Store(id='filtered-store'),
+
+    html.Div(id='exec-content'),
+    html.Div(id='stats-content', style={'display': 'none'}),
+    html.Div(id='trends-content', style={'display': 'none'}),
+    html.Div(extreme_content, id='extreme-content', style={'display': 'none'}),
+    html.Div(help_content, id='help-content', style={'display': 'none'})
 
 ])
 
 # ================================
-# 7. CALLBACKS (FIXED MONTHLY AGGREGATION)
+# 8. CALLBACKS
 # ================================
 
+def to_ns(date):
+    """DatePickerRange ISO string as int64 nanoseconds since the epoch."""
+    return np.datetime64(date, 'ns').astype(np.int64)
+
+
+def filter_data(countries, start_date, end_date, time_agg):
+
+    start, end = to_ns(start_date), to_ns(end_date)
+
+    # Monthly rows are stamped with the month start: floor the start bound
+    # so a mid-month start keeps its month. Partial edge months therefore
+    # show the full-month mean.
+    if time_agg == 'Monthly':
+        start = to_ns(np.datetime64(start_date, 'M'))
+
+    ts = TIMESTAMPS[time_agg]
+    lo = np.searchsorted(ts, start, side='left')
+    hi = np.searchsorted(ts, end, side='right')
+
+    table = TABLES[time_agg].slice(lo, hi - lo)
+
+    # If no country selected → show all
+    if countries:
+        mask = pc.is_in(table['country'], value_set=pa.array(list(countries)))
+        table = table.filter(mask)
+
+    return table.to_pandas()
+
+
+# Upper bounds on points per country sent to the browser
+MAX_LINE_POINTS = 2000
+MAX_DIST_POINTS = 5000
+
+
+def lttb_indices(x, y, n_out):
+    """Pick n_out points of (x, y) with Largest-Triangle-Three-Buckets."""
+    n = len(x)
+    if n <= n_out:
+        return np.arange(n)
+
+    # First and last points are kept; the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            nxt = slice(edges[i + 1], edges[i + 2])
+            avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(area.argmax())
+        idx[i + 1] = a
+
+    return idx
+
+
+def downsample_lines(dff, metric, n_out=MAX_LINE_POINTS):
+    """Split dff by country, each series reduced to at most n_out points."""
+    groups = {}
+    for country, g in dff.groupby('country', observed=True):
+        g = g.dropna(subset=[metric])
+        if len(g) > n_out:
+            x = g['last_updated'].values.astype(np.int64).astype(np.float64)
+            y = g[metric].to_numpy(dtype=np.float64)
+            g = g.iloc[lttb_indices(x, y, n_out)]
+        groups[country] = g
+    return groups
+
+
+def thin_groups(dff, max_points=MAX_DIST_POINTS):
+    """Split dff by country, each stride-subsampled to at most max_points rows."""
+    groups = {}
+    for country, g in dff.groupby('country', observed=True):
+        if len(g) > max_points:
+            g = g.iloc[::-(-len(g) // max_points)]
+        groups[country] = g
+    return groups
+
+
+# Hot figures are assembled from per-country traces with graph_objects,
+# skipping Plotly Express's DataFrame copy and grouping.
+@cache.memoize(make_name=versioned)
+def build_exec_figures(countries, metric, start_date, end_date, time_agg):
+    dff = filter_data(countries, start_date, end_date, time_agg)
+
+    line_fig = go.Figure([
+        go.Scattergl(x=g['last_updated'], y=g[metric], mode='lines', name=country)
+        for country, g in downsample_lines(dff, metric).items()
+    ])
+    line_fig.update_layout(
+        title='Trend Analysis',
+        xaxis_title='last_updated',
+        yaxis_title=metric,
+        legend_title='country'
+    )
+
+    geo_fig = go.Figure(go.Scattergeo(
+        locations=dff['country'].to_numpy(),
+        locationmode='country names',
+        hovertext=dff['country'].to_numpy(),
+        marker={
+            'color': dff[metric].to_numpy(),
+            'colorscale': 'Plasma',
+            'colorbar': {'title': metric}
+        }
+    ))
+    geo_fig.update_layout(title='Global Climate Map')
+
+    return line_fig.to_json(), geo_fig.to_json()
+
+
+@cache.memoize(make_name=versioned)
+def build_stats_figures(countries, start_date, end_date, time_agg):
+    dff = filter_data(countries, start_date, end_date, time_agg)
+
+    scatter_fig = go.Figure([
+        go.Scattergl(
+            x=g['temperature_celsius'],
+            y=g['humidity'],
+            mode='markers',
+            name=country
+        )
+        for country, g in thin_groups(dff).items()
+    ])
+    scatter_fig.update_layout(
+        title='Temperature vs Humidity',
+        xaxis_title='temperature_celsius',
+        yaxis_title='humidity',
+        legend_title='country'
+    )
+
+    # Plotly Express is only needed here; import it on first use to keep
+    # it out of the app's cold start.
+    import plotly.express as px
+
+    corr_fig = px.imshow(
+        dff[list(METRICS)].corr(),
+        text_auto=True,
+        title='Correlation Heatmap'
+    )
+    return scatter_fig.to_json(), corr_fig.to_json()
+
+
+@cache.memoize(make_name=versioned)
+def build_trends_figures(countries, metric, start_date, end_date, time_agg):
+    dff = filter_data(countries, start_date, end_date, time_agg)
+    sample = thin_groups(dff)
+
+    area_fig = go.Figure([
+        go.Scatter(
+            x=g['last_updated'],
+            y=g[metric],
+            mode='lines',
+            stackgroup='one',
+            name=country
+        )
+        for country, g in downsample_lines(dff, metric).items()
+    ])
+    area_fig.update_layout(
+        title='Area Chart',
+        xaxis_title='last_updated',
+        yaxis_title=metric,
+        legend_title='country'
+    )
+
+    values = [g[metric].to_numpy() for g in sample.values()]
+    violin_fig = go.Figure(go.Violin(
+        y=np.concatenate(values) if values else [],
+        box_visible=True,
+        points='all',
+        name=metric
+    ))
+    violin_fig.update_layout(title='Violin Plot', yaxis_title=metric)
+
+    box_fig = go.Figure([
+        go.Box(y=g[metric], name=country)
+        for country, g in sample.items()
+    ])
+    box_fig.update_layout(title='Box Plot', yaxis_title=metric, legend_title='country')
+
+    return area_fig.to_json(), violin_fig.to_json(), box_fig.to_json()
+
+
+# Tab switching happens in the browser; only the data-driven tabs are
+# forwarded to the server through the 'server-tab' store.
+app.clientside_callback(
+    """
+    function(tab) {
+        const tabs = ['exec', 'stats', 'trends', 'extreme', 'help'];
+        const styles = tabs.map(t => ({'display': t === tab ? 'block' : 'none'}));
+        const isStatic = tab === 'extreme' || tab === 'help';
+        return styles.concat([isStatic ? window.dash_clientside.no_update : tab]);
+    }
+    """,
+    Output('exec-content', 'style'),
+    Output('stats-content', 'style'),
+    Output('trends-content', 'style'),
+    Output('extreme-content', 'style'),
+    Output('help-content', 'style'),
+    Output('server-tab', 'data'),
+    Input('tabs', 'value')
+)
+
+
 @app.callback(
-    Output('tab-content', 'children'),
-    Input('tabs', 'value'),
+    Output('filtered-store', 'data'),
     Input('country-filter', 'value'),
-    Input('metric-selector', 'value'),
     Input('date-range', 'start_date'),
     Input('date-range', 'end_date'),
     Input('time-agg', 'value')
 )
-def render_content(tab, countries, metric, start_date, end_date, time_agg):
-
-    # If no country selected → show all
-    if not countries:
-        countries = df['country'].unique()
+def update_filters(countries, start_date, end_date, time_agg):
+
+    # Sorted so the same selection always maps to the same cache entry.
+    # The metric is left out: it only affects the Executive and Trends
+    # tabs, which take it as their own input.
+    return {
+        'countries': sorted(countries) if countries else [],
+        'start_date': start_date,
+        'end_date': end_date,
+        'time_agg': time_agg
+    }
 
-    dff = df[
-        (df['country'].isin(countries)) &
-        (df['last_updated'] >= start_date) &
-        (df['last_updated'] <= end_date)
-    ].copy()
 
-    # ================= MONTHLY AGGREGATION FIX =================
-    if time_agg == 'Monthly':
-        dff['month'] = dff['last_updated'].dt.to_period('M').dt.to_timestamp()
+def graphs(figures):
+    return html.Div([dcc.Graph(figure=json.loads(fig)) for fig in figures])
 
-        dff = (
-            dff
-            .groupby(['country', 'month'], as_index=False)
-            .agg({metric: 'mean'})
-            .rename(columns={'month': 'last_updated'})
-        )
 
-    # ================= EXECUTIVE DASHBOARD =================
-    if tab == 'exec':
-        return html.Div([
-            dcc.Graph(
-                figure=px.line(
-                    dff,
-                    x='last_updated',
-                    y=metric,
-                    color='country',
-                    title='Trend Analysis'
-                )
-            ),
-            dcc.Graph(
-                figure=px.scatter_geo(
-                    dff,
-                    locations='country',
-                    locationmode='country names',
-                    color=metric,
-                    hover_name='country',
-                    title='Global Climate Map'
-                )
-            )
-        ])
-
-    # ================= STATISTICAL ANALYSIS =================
-    if tab == 'stats':
-        return html.Div([
-            dcc.Graph(
-                figure=px.scatter(
-                    dff,
-                    x='temperature_celsius',
-                    y='humidity',
-                    color='country',
-                    title='Temperature vs Humidity'
-                )
-            ),
-            dcc.Graph(
-                figure=px.imshow(
-                    dff[list(METRICS.keys())].corr(),
-                    text_auto=True,
-                    title='Correlation Heatmap'
-                )
-            )
-        ])
-
-    # ================= CLIMATE TRENDS =================
-    if tab == 'trends':
-        return html.Div([
-            dcc.Graph(
-                figure=px.area(
-                    dff,
-                    x='last_updated',
-                    y=metric,
-                    color='country',
-                    title='Area Chart'
-                )
-            ),
-            dcc.Graph(
-                figure=px.violin(
-                    dff,
-                    y=metric,
-                    box=True,
-                    points='all',
-                    title='Violin Plot'
-                )
-            ),
-            dcc.Graph(
-                figure=px.box(
-                    dff,
-                    y=metric,
-                    color='country',
-                    title='Box Plot'
-                )
-            )
-        ])
-
-    # ================= EXTREME EVENTS =================
-    if tab == 'extreme':
-        return html.Div([
-            dash_table.DataTable(
-                data=extreme_df.to_dict('records'),
-                columns=[{'name': c, 'id': c} for c in extreme_df.columns],
-                page_size=10,
-                style_table={'overflowX': 'auto'}
-            ),
-            dcc.Graph(
-                figure=px.histogram(
-                    extreme_df,
-                    x='country',
-                    title='Extreme Event Frequency'
-                )
-            )
-        ])
-
-    # ================= HELP =================
-    if tab == 'help':
-        return html.Div([
-            html.H4("Help & User Guide"),
-            html.P(
-                "Use the filters above to explore climate metrics. "
-                "Choose Daily or Monthly aggregation for trend analysis. "
-                "Hover, zoom, and download charts using Plotly tools."
-            )
-        ])
+# ================= EXECUTIVE DASHBOARD =================
+@app.callback(
+    Output('exec-content', 'children'),
+    Input('server-tab', 'data'),
+    Input('filtered-store', 'data'),
+    Input('metric-selector', 'value')
+)
+def render_exec(tab, filters, metric):
+    if tab != 'exec':
+        return no_update
+    return graphs(build_exec_figures(
+        tuple(filters['countries']),
+        metric,
+        filters['start_date'],
+        filters['end_date'],
+        filters['time_agg']
+    ))
+
+
+# ================= STATISTICAL ANALYSIS =================
+@app.callback(
+    Output('stats-content', 'children'),
+    Input('server-tab', 'data'),
+    Input('filtered-store', 'data')
+)
+def render_stats(tab, filters):
+    if tab != 'stats':
+        return no_update
+    return graphs(build_stats_figures(
+        tuple(filters['countries']),
+        filters['start_date'],
+        filters['end_date'],
+        filters['time_agg']
+    ))
+
+
+# ================= CLIMATE TRENDS =================
+@app.callback(
+    Output('trends-content', 'children'),
+    Input('server-tab', 'data'),
+    Input('filtered-store', 'data'),
+    Input('metric-selector', 'value')
+)
+def render_trends(tab, filters, metric):
+    if tab != 'trends':
+        return no_update
+    return graphs(build_trends_figures(
+        tuple(filters['countries']),
+        metric,
+        filters['start_date'],
+        filters['end_date'],
+        filters['time_agg']
+    ))
+
+
+# Only the visible page of extreme events is sent to the browser
+@app.callback(
+    Output('extreme-table', 'data'),
+    Input('extreme-table', 'page_current'),
+    Input('extreme-table', 'page_size')
+)
+def update_extreme_page(page_current, page_size):
+    start = page_current * page_size
+    return extreme_df.iloc[start:start + page_size].to_dict('records')
 
 # ================================
-# 8. RUN APP
+# 9. RUN APP
 # ================================
 
 if __name__ == "__main__":
@@ -0,0 +1,16 @@
+# ================================
+# ClimateScope WSGI Entry Point
+# ================================
+#
+# Serve the dashboard with a multi-worker server instead of the Flask
+# development server, e.g.:
+#
+#   gunicorn --preload -w 4 -k gthread --threads 4 wsgi:server
+#
+# --preload loads the data once in the master before forking, so the
+# workers share it instead of each rebuilding it. Set REDIS_URL so every
+# worker shares one figure cache.
+
+from app import app
+
+server = app.server